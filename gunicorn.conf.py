@@ -0,0 +1,19 @@
+import os
+
+# ========================================
+# 🦄 GUNICORN (PRODUÇÃO)
+# ========================================
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# Um único processo com várias threads: caches, dedupe de notificações e
+# rate limit do Slack ficam em memória e precisam ser compartilhados
+workers = 1
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "32"))
+timeout = 60
+
+def post_worker_init(worker):
+    """Inicia o monitoramento dentro do worker (mesmo processo dos webhooks)"""
+    import main
+    main.init_bot()
@@ -1,166 +1,363 @@
 import os
+import sys
 import time
 import json
+import base64
 import requests
-import schedule
+import orjson
 import re
-from datetime import datetime, timedelta
+import functools
+import heapq
+import math
+import hmac
+import hashlib
+import atexit
+import logging
+import logging.handlers
+import queue
+from datetime import date, datetime, timedelta
 from flask import Flask, request, jsonify
-from threading import Thread
+from flask.json.provider import DefaultJSONProvider
+from threading import Timer, Lock
+from collections import defaultdict, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Provider JSON do Flask usando orjson (request.get_json, jsonify)"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
+
+# ========================================
+# 📝 LOGS (I/O EM THREAD SEPARADA)
+# ========================================
+
+# As threads de request só enfileiram o LogRecord; o listener escreve no stdout
+_log_queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler(sys.stdout))
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+logger = logging.getLogger("jiraldo")
+logger.setLevel(logging.INFO)
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+logger.propagate = False
 
 # ========================================
 # ⚙️ CONFIGURAÇÕES
 # ========================================
 
 SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN")
+SLACK_SIGNING_SECRET = os.getenv("SLACK_SIGNING_SECRET")
 JIRA_BASE_URL = os.getenv("JIRA_BASE_URL", "https://ifood.atlassian.net")
 JIRA_EMAIL = os.getenv("JIRA_EMAIL")
 JIRA_API_TOKEN = os.getenv("JIRA_API_TOKEN")
+JIRA_WEBHOOK_SECRET = os.getenv("JIRA_WEBHOOK_SECRET")
 
-CHECK_INTERVAL_MINUTES = 2
+# Com webhook configurado, o polling vira só fallback
+CHECK_INTERVAL_MINUTES = 15 if JIRA_WEBHOOK_SECRET else 2
+MAX_CHECK_INTERVAL_MINUTES = 15  # teto do backoff quando não há atribuições
 NOTIFICATION_HOURS = (8, 18)
 EMAIL_DOMAIN = "@ifood.com.br"
 PORT = int(os.getenv("PORT", 5000))
+HTTP_TIMEOUT = (3.05, 10)  # (connect, read) em segundos
+SLACK_USER_CACHE_TTL = 1800  # segundos
+NOTIFICATION_WORKERS = 5  # DMs concorrentes; mais que isso só espera no rate limit do Slack
+BACKGROUND_WORKERS = 8
+NOTIFIED_CACHE_SIZE = 2048
+SEEN_EVENTS_CACHE_SIZE = 1024
+SLACK_SIGNATURE_MAX_AGE = 300  # segundos (proteção contra replay)
+SLACK_RATE_PER_SECOND = 1
+SLACK_RATE_BURST = 5
+SLACK_MAX_ATTACHMENTS = 100  # limite de attachments por mensagem no Slack
+TEAM_SUMMARY_CACHE_TTL = 90  # segundos
+USER_TICKETS_CACHE_TTL = 30  # segundos
+TTL_CACHE_MAX_ENTRIES = 1024
+MAX_ASSIGNMENT_WINDOW_MINUTES = 24 * 60
+DEADLINES_CACHE_TTL = 300  # segundos
+JIRA_PAGE_SIZE = 100
+TEAM_SUMMARY_MAX_ISSUES = 1000
 
 if not all([SLACK_BOT_TOKEN, JIRA_EMAIL, JIRA_API_TOKEN]):
-    print("❌ CONFIGURE AS VARIÁVEIS DE AMBIENTE NO RENDER:")
-    print("   SLACK_BOT_TOKEN")
-    print("   JIRA_EMAIL") 
-    print("   JIRA_API_TOKEN")
+    logger.error("❌ CONFIGURE AS VARIÁVEIS DE AMBIENTE NO RENDER:")
+    logger.error("   SLACK_BOT_TOKEN")
+    logger.error("   JIRA_EMAIL")
+    logger.error("   JIRA_API_TOKEN")
+
+if not SLACK_SIGNING_SECRET:
+    logger.error("❌ SLACK_SIGNING_SECRET não configurado: /events e /jiraldo vão recusar todas as requisições")
+
+# Headers de autenticação Jira (calculados uma única vez)
+JIRA_CREDENTIALS = base64.b64encode(f"{JIRA_EMAIL}:{JIRA_API_TOKEN}".encode()).decode()
+JIRA_HEADERS = {
+    "Authorization": f"Basic {JIRA_CREDENTIALS}",
+    "Content-Type": "application/json",
+    "Accept": "application/json"
+}
+
+# ========================================
+# 🌐 SESSÕES HTTP (CONEXÕES REAPROVEITADAS)
+# ========================================
+
+def create_session(headers, retry_methods, retry_statuses):
+    """Cria sessão HTTP com pool de conexões e retry"""
+    session = requests.Session()
+    session.headers.update(headers)
+    retry = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=retry_statuses,
+        allowed_methods=retry_methods
+    )
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=retry))
+    return session
+
+# Buscas JQL via POST são somente leitura, então podem ser repetidas
+jira_session = create_session(JIRA_HEADERS, ["GET", "POST"], [429, 502, 503, 504])
+# Slack: só repete GET para não duplicar mensagens; 429 é tratado em slack_request
+slack_session = create_session({"Authorization": f"Bearer {SLACK_BOT_TOKEN}"}, ["GET"], [502, 503, 504])
+
+class TokenBucket:
+    """Limitador de taxa simples (token bucket) thread-safe"""
+    
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self.lock = Lock()
+    
+    def acquire(self):
+        """Bloqueia até haver um token disponível"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+slack_bucket = TokenBucket(SLACK_RATE_PER_SECOND, SLACK_RATE_BURST)
+
+def slack_request(method, url, **kwargs):
+    """Chamada à API Slack respeitando rate limit (e Retry-After em 429)"""
+    slack_bucket.acquire()
+    response = slack_session.request(method, url, **kwargs)
+    
+    if response.status_code == 429:
+        retry_after = int(response.headers.get("Retry-After", "1"))
+        logger.warning(f"⏳ Rate limit Slack, aguardando {retry_after}s")
+        time.sleep(retry_after)
+        slack_bucket.acquire()
+        response = slack_session.request(method, url, **kwargs)
+    
+    return response
 
 # ========================================
 # 🔧 FUNÇÕES JIRA (API CORRIGIDA)
 # ========================================
 
-def get_jira_headers():
-    """Headers para autenticação Jira"""
-    import base64
-    credentials = base64.b64encode(f"{JIRA_EMAIL}:{JIRA_API_TOKEN}".encode()).decode()
-    return {
-        "Authorization": f"Basic {credentials}",
-        "Content-Type": "application/json",
-        "Accept": "application/json"
+def ttl_cache(ttl, max_entries=TTL_CACHE_MAX_ENTRIES):
+    """Cache LRU em memória com expiração, por argumentos (ignora resultados vazios)"""
+    def decorator(func):
+        cache = OrderedDict()
+        lock = Lock()
+        
+        @functools.wraps(func)
+        def wrapper(*args):
+            now = time.monotonic()
+            with lock:
+                cached = cache.get(args)
+                if cached and cached[0] > now:
+                    cache.move_to_end(args)
+                    return cached[1]
+            
+            result = func(*args)
+            if result:
+                with lock:
+                    cache[args] = (now + ttl, result)
+                    cache.move_to_end(args)
+                    if len(cache) > max_entries:
+                        # Descartar expiradas primeiro; se ainda cheio, as menos usadas
+                        for key, (expires, _) in list(cache.items()):
+                            if expires <= now:
+                                del cache[key]
+                        while len(cache) > max_entries:
+                            cache.popitem(last=False)
+            return result
+        
+        return wrapper
+    return decorator
+
+JIRA_SEARCH_URL = f"{JIRA_BASE_URL}/rest/api/3/search/jql"
+
+def search_jira(jql_query, fields, max_results, next_page_token=None):
+    """Executa uma busca JQL (uma página); None se o Jira responder com erro"""
+    payload = {
+        "jql": jql_query,
+        "fields": fields,
+        "maxResults": max_results
     }
+    if next_page_token:
+        payload["nextPageToken"] = next_page_token
+    
+    response = jira_session.post(JIRA_SEARCH_URL, json=payload, timeout=HTTP_TIMEOUT)
+    
+    if response.status_code != 200:
+        logger.error(f"❌ Erro Jira {response.status_code}: {jql_query}")
+        return None
+    return orjson.loads(response.content)
 
-def get_user_tickets(email):
-    """Busca tickets de um usuário"""
+def search_user_tickets(email, fields):
+    """Busca tickets em aberto de um usuário com os campos pedidos"""
     try:
         jql_query = f'assignee = "{email}" AND status != Done ORDER BY priority DESC, created DESC'
         
-        url = f"{JIRA_BASE_URL}/rest/api/3/search/jql"
-        payload = {
-            "jql": jql_query,
-            "fields": ["key", "summary", "status", "priority", "assignee", "created", "duedate"],
-            "maxResults": 20
-        }
-        
-        response = requests.post(url, headers=get_jira_headers(), json=payload, timeout=30)
-        
-        if response.status_code == 200:
-            return response.json().get("issues", [])
-        return []
+        data = search_jira(jql_query, fields, 20)
+        return data.get("issues", []) if data else []
         
     except Exception as e:
-        print(f"❌ Erro buscar tickets: {e}")
+        logger.error(f"❌ Erro buscar tickets: {e}")
         return []
 
+@ttl_cache(USER_TICKETS_CACHE_TTL)
+def get_user_tickets(email):
+    """Busca tickets de um usuário (todos os campos, para debug)"""
+    return search_user_tickets(email, ["key", "summary", "status", "priority", "assignee", "created", "duedate"])
+
+@ttl_cache(USER_TICKETS_CACHE_TTL)
+def get_user_tickets_brief(email):
+    """Busca tickets de um usuário só com o que o chat exibe"""
+    return search_user_tickets(email, ["summary", "status", "priority"])
+
+# Trecho do status -> contador (a ordem importa: "bloqueado" contém "do")
+STATUS_MAP = {
+    "progress": "em_progresso",
+    "doing": "em_progresso",
+    "block": "bloqueado",
+    "bloque": "bloqueado",
+    "do": "a_fazer",
+    "fazer": "a_fazer"
+}
+
+@ttl_cache(TEAM_SUMMARY_CACHE_TTL)
 def get_team_summary():
     """Relatório resumido da equipe"""
     try:
         # Buscar todos os tickets em aberto da equipe
         jql_query = 'status != Done AND assignee is not EMPTY ORDER BY assignee'
         
-        url = f"{JIRA_BASE_URL}/rest/api/3/search/jql"
-        payload = {
-            "jql": jql_query,
-            "fields": ["assignee", "status", "priority"],
-            "maxResults": 200
-        }
-        
-        response = requests.post(url, headers=get_jira_headers(), json=payload, timeout=30)
-        
-        if response.status_code == 200:
-            issues = response.json().get("issues", [])
+        # Paginação via nextPageToken (o endpoint /search/jql não aceita startAt)
+        issues = []
+        next_page_token = None
+        while len(issues) < TEAM_SUMMARY_MAX_ISSUES:
+            data = search_jira(jql_query, ["assignee", "status"], JIRA_PAGE_SIZE, next_page_token)
+            if not data:
+                return {}
             
-            # Agrupar por assignee
-            team_stats = {}
-            for issue in issues:
-                assignee = issue["fields"]["assignee"]["emailAddress"]
-                name = issue["fields"]["assignee"]["displayName"]
-                status = issue["fields"]["status"]["name"]
-                
-                if assignee not in team_stats:
-                    team_stats[assignee] = {
-                        "name": name,
-                        "total": 0,
-                        "em_progresso": 0,
-                        "a_fazer": 0,
-                        "bloqueado": 0
-                    }
-                
-                team_stats[assignee]["total"] += 1
-                
-                if "progress" in status.lower() or "doing" in status.lower():
-                    team_stats[assignee]["em_progresso"] += 1
-                elif "do" in status.lower() or "fazer" in status.lower():
-                    team_stats[assignee]["a_fazer"] += 1
-                elif "block" in status.lower() or "bloque" in status.lower():
-                    team_stats[assignee]["bloqueado"] += 1
+            issues.extend(data.get("issues", []))
             
-            return team_stats
-        return {}
+            next_page_token = data.get("nextPageToken")
+            if data.get("isLast", True) or not next_page_token:
+                break
+        
+        # Agrupar por assignee
+        team_stats = defaultdict(lambda: {
+            "name": "",
+            "total": 0,
+            "em_progresso": 0,
+            "a_fazer": 0,
+            "bloqueado": 0
+        })
+        for issue in issues:
+            assignee = issue["fields"]["assignee"]
+            stats = team_stats[assignee["emailAddress"]]
+            stats["name"] = assignee["displayName"]
+            stats["total"] += 1
+            
+            status_lower = issue["fields"]["status"]["name"].lower()
+            bucket = next((v for k, v in STATUS_MAP.items() if k in status_lower), None)
+            if bucket:
+                stats[bucket] += 1
+        
+        return dict(team_stats)
         
     except Exception as e:
-        print(f"❌ Erro relatório equipe: {e}")
+        logger.error(f"❌ Erro relatório equipe: {e}")
         return {}
 
+@ttl_cache(DEADLINES_CACHE_TTL)
 def get_upcoming_deadlines():
     """Busca deadlines próximos"""
     try:
         # Issues com due date nos próximos 7 dias
         jql_query = 'duedate >= now() AND duedate <= "7d" AND status != Done ORDER BY duedate ASC'
         
-        url = f"{JIRA_BASE_URL}/rest/api/3/search/jql"
-        payload = {
-            "jql": jql_query,
-            "fields": ["key", "summary", "duedate", "assignee", "priority"],
-            "maxResults": 20
-        }
-        
-        response = requests.post(url, headers=get_jira_headers(), json=payload, timeout=30)
-        
-        if response.status_code == 200:
-            return response.json().get("issues", [])
-        return []
+        data = search_jira(jql_query, ["key", "summary", "duedate", "assignee", "priority"], 20)
+        return data.get("issues", []) if data else []
         
     except Exception as e:
-        print(f"❌ Erro deadlines: {e}")
+        logger.error(f"❌ Erro deadlines: {e}")
         return []
 
+# Cursor: momento (monotonic) da última busca de atribuições bem-sucedida
+_last_assignment_check = None
+
 def get_recent_assignments():
-    """Busca atribuições recentes no Jira - para notificações automáticas"""
+    """Busca atribuições desde a última verificação - para notificações automáticas"""
+    global _last_assignment_check
     try:
-        jql_query = "assignee changed during (-3m, now()) AND assignee is not EMPTY"
+        started = time.monotonic()
         
-        url = f"{JIRA_BASE_URL}/rest/api/3/search/jql"
-        payload = {
-            "jql": jql_query,
-            "fields": ["key", "summary", "assignee", "status", "priority", "creator", "updated"],
-            "maxResults": 50
-        }
+        # Primeira busca do processo: janela padrão de um intervalo. O cursor
+        # é fixado já aqui para uma falha não encolher a janela seguinte
+        if _last_assignment_check is None:
+            _last_assignment_check = started - CHECK_INTERVAL_MINUTES * 60
         
-        response = requests.post(url, headers=get_jira_headers(), json=payload, timeout=30)
+        # Janela relativa (evita depender do fuso do usuário Jira na JQL),
+        # com 1min de folga para não perder atribuições
+        elapsed = math.ceil((started - _last_assignment_check) / 60)
+        window = min(elapsed + 1, MAX_ASSIGNMENT_WINDOW_MINUTES)
         
-        if response.status_code == 200:
-            return response.json().get("issues", [])
-        else:
-            print(f"❌ Erro Jira Recent: {response.status_code}")
-            return []
+        jql_query = f"assignee changed during (-{window}m, now()) AND assignee is not EMPTY ORDER BY updated ASC"
+        
+        fields = ["key", "summary", "assignee", "status", "priority", "creator", "updated"]
+        
+        # Paginação via nextPageToken até o fim: a janela (máx. 24h) pode
+        # cobrir a noite toda e um corte perderia as atribuições mais novas
+        issues = []
+        next_page_token = None
+        while True:
+            data = search_jira(jql_query, fields, JIRA_PAGE_SIZE, next_page_token)
+            if not data:
+                # Falha no meio: notifica o que veio e mantém o cursor, para a
+                # próxima verificação repetir a janela inteira (o dedupe evita DMs repetidas)
+                return issues
             
+            issues.extend(data.get("issues", []))
+            
+            next_page_token = data.get("nextPageToken")
+            if data.get("isLast", True) or not next_page_token:
+                break
+        
+        _last_assignment_check = started
+        return issues
+        
     except Exception as e:
-        print(f"❌ Erro ao consultar atribuições: {e}")
+        logger.error(f"❌ Erro ao consultar atribuições: {e}")
         return []
 
 # ========================================
@@ -170,27 +367,25 @@ def get_recent_assignments():
 def get_slack_user_by_mention(user_id):
     """Busca informações do usuário Slack"""
     try:
-        headers = {"Authorization": f"Bearer {SLACK_BOT_TOKEN}"}
-        
-        response = requests.get(
+        response = slack_request(
+            "GET",
             f"https://slack.com/api/users.info",
-            headers=headers,
-            params={"user": user_id}
+            params={"user": user_id},
+            timeout=HTTP_TIMEOUT
         )
         
-        if response.json().get("ok"):
-            return response.json()["user"]
+        data = orjson.loads(response.content)
+        if data.get("ok"):
+            return data["user"]
         return None
         
     except Exception as e:
-        print(f"❌ Erro buscar usuário: {e}")
+        logger.error(f"❌ Erro buscar usuário: {e}")
         return None
 
 def send_channel_message(channel_id, message, thread_ts=None):
     """Envia mensagem pública no canal"""
     try:
-        headers = {"Authorization": f"Bearer {SLACK_BOT_TOKEN}"}
-        
         payload = {
             "channel": channel_id,
             "text": message,
@@ -202,33 +397,41 @@ def send_channel_message(channel_id, message, thread_ts=None):
         if thread_ts:
             payload["thread_ts"] = thread_ts
         
-        response = requests.post(
+        response = slack_request(
+            "POST",
             "https://slack.com/api/chat.postMessage",
-            headers=headers,
-            json=payload
+            json=payload,
+            timeout=HTTP_TIMEOUT
         )
         
-        return response.json().get("ok", False)
+        return orjson.loads(response.content).get("ok", False)
         
     except Exception as e:
-        print(f"❌ Erro enviar mensagem: {e}")
+        logger.error(f"❌ Erro enviar mensagem: {e}")
         return False
 
+@ttl_cache(SLACK_USER_CACHE_TTL)
+def get_slack_user_id_by_email(user_email):
+    """Busca ID Slack pelo email (users.lookupByEmail é Tier 3: com cache)"""
+    response = slack_request(
+        "GET",
+        "https://slack.com/api/users.lookupByEmail",
+        params={"email": user_email},
+        timeout=HTTP_TIMEOUT
+    )
+    
+    data = orjson.loads(response.content)
+    if not data.get("ok"):
+        return None
+    
+    return data["user"]["id"]
+
 def send_slack_dm(user_email, message, attachments=None):
     """Envia DM para usuário no Slack - para notificações automáticas"""
     try:
-        headers = {"Authorization": f"Bearer {SLACK_BOT_TOKEN}"}
-        
-        user_response = requests.get(
-            "https://slack.com/api/users.lookupByEmail",
-            headers=headers,
-            params={"email": user_email},
-            timeout=30
-        )
+        user_id = get_slack_user_id_by_email(user_email)
         
-        if user_response.json().get("ok"):
-            user_id = user_response.json()["user"]["id"]
-            
+        if user_id:
             payload = {
                 "channel": user_id,
                 "text": message,
@@ -239,160 +442,207 @@ def send_slack_dm(user_email, message, attachments=None):
             if attachments:
                 payload["attachments"] = attachments
             
-            dm_response = requests.post(
+            dm_response = slack_request(
+                "POST",
                 "https://slack.com/api/chat.postMessage",
-                headers=headers,
                 json=payload,
-                timeout=30
+                timeout=HTTP_TIMEOUT
             )
             
-            return dm_response.json().get("ok", False)
+            return orjson.loads(dm_response.content).get("ok", False)
         else:
-            print(f"❌ Usuário não encontrado: {user_email}")
+            logger.error(f"❌ Usuário não encontrado: {user_email}")
             return False
         
     except Exception as e:
-        print(f"❌ Erro ao enviar DM: {e}")
+        logger.error(f"❌ Erro ao enviar DM: {e}")
         return False
 
-def send_slack_notification(assignment):
-    """Envia notificação DM de atribuição"""
+def build_assignment_attachment(assignment):
+    """Attachment Slack de um ticket atribuído"""
+    ticket_key = assignment["key"]
+    ticket_summary = assignment["fields"]["summary"]
+    priority = assignment["fields"]["priority"]["name"]
+    ticket_url = f"{JIRA_BASE_URL}/browse/{ticket_key}"
+    
+    return {
+        "color": "good",
+        "fields": [
+            {"title": "Ticket", "value": ticket_key, "short": True},
+            {"title": "Prioridade", "value": priority, "short": True},
+            {"title": "Título", "value": ticket_summary, "short": False}
+        ],
+        "actions": [{
+            "type": "button",
+            "text": "🔗 Abrir no Jira",
+            "url": ticket_url
+        }],
+        "footer": "Jiraldo Bot",
+        "ts": time.time()
+    }
+
+def send_slack_notification(assignee_email, assignments):
+    """Envia as novas atribuições da pessoa numa DM (várias se passar do limite do Slack)"""
     try:
-        assignee_email = assignment["fields"]["assignee"]["emailAddress"]
-        ticket_key = assignment["key"]
-        ticket_summary = assignment["fields"]["summary"]
-        priority = assignment["fields"]["priority"]["name"]
-        ticket_url = f"{JIRA_BASE_URL}/browse/{ticket_key}"
-        
-        message = f"🎯 Novo ticket atribuído para você!"
-        
-        attachments = [{
-            "color": "good",
-            "fields": [
-                {"title": "Ticket", "value": ticket_key, "short": True},
-                {"title": "Prioridade", "value": priority, "short": True},
-                {"title": "Título", "value": ticket_summary, "short": False}
-            ],
-            "actions": [{
-                "type": "button",
-                "text": "🔗 Abrir no Jira",
-                "url": ticket_url
-            }],
-            "footer": "Jiraldo Bot",
-            "ts": time.time()
-        }]
-        
-        success = send_slack_dm(assignee_email, message, attachments)
+        if len(assignments) == 1:
+            message = "🎯 Novo ticket atribuído para você!"
+        else:
+            message = f"🎯 {len(assignments)} novos tickets atribuídos para você!"
         
-        if success:
-            print(f"✅ Notificação enviada para {assignee_email}")
+        attachments = [build_assignment_attachment(a) for a in assignments]
+        
+        # Slack recusa mensagens com mais de 100 attachments (too_many_attachments)
+        sent = 0
+        for start in range(0, len(attachments), SLACK_MAX_ATTACHMENTS):
+            chunk = attachments[start:start + SLACK_MAX_ATTACHMENTS]
+            text = message if start == 0 else "🎯 (continuação)"
+            
+            if send_slack_dm(assignee_email, text, chunk):
+                sent += len(chunk)
+        
+        if sent == len(assignments):
+            logger.info(f"✅ Notificação enviada para {assignee_email} ({len(assignments)} ticket(s))")
         else:
-            print(f"❌ Falha ao notificar {assignee_email}")
+            logger.error(f"❌ Falha ao notificar {assignee_email} ({sent}/{len(assignments)} ticket(s) enviados)")
             
     except Exception as e:
-        print(f"❌ Erro na notificação: {e}")
+        logger.error(f"❌ Erro na notificação: {e}")
+
+# Pool para enviar notificações em paralelo
+notif_pool = ThreadPoolExecutor(max_workers=NOTIFICATION_WORKERS)
+# Pool para comandos/eventos respondidos de forma assíncrona
+executor = ThreadPoolExecutor(max_workers=BACKGROUND_WORKERS)
+
+# Atribuições já notificadas (webhook + polling): ticket -> email do assignee
+# notificado, LRU limitado em tamanho. Reatribuir o ticket substitui a entrada,
+# então uma volta para a mesma pessoa é notificada de novo
+_notified = OrderedDict()
+_notified_lock = Lock()
+
+def mark_seen(seen, lock, key, max_size):
+    """Registra a chave num LRU limitado; False se ela já estava lá"""
+    with lock:
+        if key in seen:
+            return False
+        seen[key] = None
+        if len(seen) > max_size:
+            seen.popitem(last=False)
+    return True
+
+def is_new_assignment(assignment):
+    """Marca a atribuição como notificada; False se já tinha sido"""
+    ticket_key = assignment["key"]
+    assignee_email = assignment["fields"]["assignee"]["emailAddress"]
+    
+    with _notified_lock:
+        if _notified.get(ticket_key) == assignee_email:
+            return False
+        _notified[ticket_key] = assignee_email
+        _notified.move_to_end(ticket_key)
+        if len(_notified) > NOTIFIED_CACHE_SIZE:
+            _notified.popitem(last=False)
+    return True
+
+def forget_assignment(ticket_key):
+    """Esquece o ticket (ex.: ficou sem assignee)"""
+    with _notified_lock:
+        _notified.pop(ticket_key, None)
+
+def notify_assignment_once(assignment):
+    """Notifica a atribuição só se ainda não foi notificada (roda no notif_pool)"""
+    try:
+        if is_new_assignment(assignment):
+            send_slack_notification(assignment["fields"]["assignee"]["emailAddress"], [assignment])
+    except Exception as e:
+        logger.error(f"❌ Erro na notificação de {assignment.get('key')}: {e}")
 
 # ========================================
 # 🧠 PROCESSAMENTO LINGUAGEM NATURAL
 # ========================================
 
-def process_natural_question(text, user_id, channel_id):
-    """Processa pergunta em linguagem natural"""
-    
-    text_lower = text.lower()
-    
-    # Remover menção ao bot
-    text_clean = re.sub(r'<@[A-Z0-9]+>', '', text_lower).strip()
+# Menções Slack (<@U123ABC>)
+_MENTION_RE = re.compile(r'<@[A-Z0-9]+>')
+
+# ========== COMANDOS PESSOAIS ==========
+
+def handle_tickets(user_email, display_name):
+    """Lista os tickets em aberto do usuário"""
+    tickets = get_user_tickets_brief(user_email)
     
-    # Buscar informações do usuário
-    slack_user = get_slack_user_by_mention(user_id)
-    if not slack_user:
-        return "❌ Não consegui identificar seu usuário."
+    if not tickets:
+        return f"🎉 @{display_name}, você não tem tickets em aberto!"
     
-    user_email = slack_user.get("profile", {}).get("email", "")
-    if not user_email:
-        # Tentar construir email pelo nome de usuário
-        username = slack_user.get("name", "")
-        user_email = username + EMAIL_DOMAIN
+    response = f"🎯 @{display_name}, você tem {len(tickets)} ticket(s) em aberto:\n"
+    for i, ticket in enumerate(tickets[:5], 1):
+        key = ticket["key"]
+        summary = ticket["fields"]["summary"]
+        status = ticket["fields"]["status"]["name"]
+        priority = ticket["fields"]["priority"]["name"]
+        
+        emoji = "🔥" if "high" in priority.lower() or "urgent" in priority.lower() else "📝"
+        response += f"{emoji} *{key}*: {summary} _({status})_\n"
     
-    display_name = slack_user.get("real_name", slack_user.get("name", ""))
+    if len(tickets) > 5:
+        response += f"\n... e mais {len(tickets) - 5} tickets"
+        
+    return response
+
+# ========== COMANDOS DA EQUIPE ==========
+
+def handle_team(user_email, display_name):
+    """Relatório resumido da equipe"""
+    team_stats = get_team_summary()
     
-    # ========== COMANDOS PESSOAIS ==========
+    if not team_stats:
+        return "❌ Não consegui gerar relatório da equipe."
     
-    if any(word in text_clean for word in ["meus tickets", "tickets", "minhas tarefas"]):
-        tickets = get_user_tickets(user_email)
+    response = "📊 *Relatório da Equipe:*\n"
+    for email, stats in heapq.nlargest(10, team_stats.items(), key=lambda x: x[1]["total"]):
+        name = stats["name"].split()[0]  # Primeiro nome
+        total = stats["total"]
+        em_progresso = stats["em_progresso"]
+        bloqueado = stats["bloqueado"]
         
-        if not tickets:
-            return f"🎉 @{display_name}, você não tem tickets em aberto!"
+        status_emoji = "🚨" if bloqueado > 0 else "🔥" if em_progresso > 2 else "✅"
+        response += f"{status_emoji} *{name}*: {total} tickets"
         
-        response = f"🎯 @{display_name}, você tem {len(tickets)} ticket(s) em aberto:\n"
-        for i, ticket in enumerate(tickets[:5], 1):
-            key = ticket["key"]
-            summary = ticket["fields"]["summary"]
-            status = ticket["fields"]["status"]["name"]
-            priority = ticket["fields"]["priority"]["name"]
-            
-            emoji = "🔥" if "high" in priority.lower() or "urgent" in priority.lower() else "📝"
-            response += f"{emoji} *{key}*: {summary} _({status})_\n"
+        if em_progresso > 0:
+            response += f" ({em_progresso} em progresso)"
+        if bloqueado > 0:
+            response += f" ⚠️ {bloqueado} bloqueado(s)"
         
-        if len(tickets) > 5:
-            response += f"\n... e mais {len(tickets) - 5} tickets"
-            
-        return response
+        response += "\n"
     
-    # ========== COMANDOS DA EQUIPE ==========
+    return response
+
+def handle_deadlines(user_email, display_name):
+    """Lista deadlines dos próximos 7 dias"""
+    deadlines = get_upcoming_deadlines()
     
-    elif any(word in text_clean for word in ["relatório", "equipe", "time", "team"]):
-        team_stats = get_team_summary()
-        
-        if not team_stats:
-            return "❌ Não consegui gerar relatório da equipe."
-        
-        response = "📊 *Relatório da Equipe:*\n"
-        for email, stats in sorted(team_stats.items(), key=lambda x: x[1]["total"], reverse=True)[:10]:
-            name = stats["name"].split()[0]  # Primeiro nome
-            total = stats["total"]
-            em_progresso = stats["em_progresso"]
-            bloqueado = stats["bloqueado"]
-            
-            status_emoji = "🚨" if bloqueado > 0 else "🔥" if em_progresso > 2 else "✅"
-            response += f"{status_emoji} *{name}*: {total} tickets"
-            
-            if em_progresso > 0:
-                response += f" ({em_progresso} em progresso)"
-            if bloqueado > 0:
-                response += f" ⚠️ {bloqueado} bloqueado(s)"
-            
-            response += "\n"
-        
-        return response
+    if not deadlines:
+        return "🎉 Não há deadlines próximos nos próximos 7 dias!"
     
-    elif any(word in text_clean for word in ["deadline", "prazo", "vencimento", "entrega"]):
-        deadlines = get_upcoming_deadlines()
-        
-        if not deadlines:
-            return "🎉 Não há deadlines próximos nos próximos 7 dias!"
+    response = "⏰ *Deadlines Próximos:*\n"
+    today = date.today()
+    for deadline in deadlines[:10]:
+        key = deadline["key"]
+        summary = deadline["fields"]["summary"][:50]
+        due_date = deadline["fields"]["duedate"]
+        assignee_name = deadline["fields"]["assignee"]["displayName"].split()[0]
         
-        response = "⏰ *Deadlines Próximos:*\n"
-        for deadline in deadlines[:10]:
-            key = deadline["key"]
-            summary = deadline["fields"]["summary"][:50]
-            due_date = deadline["fields"]["duedate"]
-            assignee_name = deadline["fields"]["assignee"]["displayName"].split()[0]
-            
-            # Calcular dias restantes
-            due_datetime = datetime.strptime(due_date, "%Y-%m-%d")
-            days_left = (due_datetime - datetime.now()).days
-            
-            urgency = "🚨" if days_left <= 1 else "⚠️" if days_left <= 3 else "📅"
-            response += f"{urgency} *{key}*: {summary}... - {assignee_name} ({days_left} dias)\n"
+        # Calcular dias restantes
+        days_left = (date.fromisoformat(due_date) - today).days
         
-        return response
+        urgency = "🚨" if days_left <= 1 else "⚠️" if days_left <= 3 else "📅"
+        response += f"{urgency} *{key}*: {summary}... - {assignee_name} ({days_left} dias)\n"
     
-    # ========== COMANDOS GERAIS ==========
-    
-    elif any(word in text_clean for word in ["help", "ajuda", "comandos"]):
-        return """🤖 *Comandos do Jiraldo:*
+    return response
+
+# ========== COMANDOS GERAIS ==========
+
+def handle_help(user_email, display_name):
+    """Lista de comandos"""
+    return """🤖 *Comandos do Jiraldo:*
 
 *👤 Pessoais:*
 • "meus tickets" - Ver seus tickets
@@ -406,10 +656,12 @@ def process_natural_question(text, user_id, channel_id):
 • @Jiraldo meus tickets
 • @Jiraldo relatório da equipe
 • @Jiraldo deadlines próximos"""
-    
-    # ========== DEFAULT ==========
-    else:
-        return f"""🤔 @{display_name}, não entendi sua pergunta. 
+
+# ========== DEFAULT ==========
+
+def handle_default(user_email, display_name):
+    """Resposta para perguntas não reconhecidas"""
+    return f"""🤔 @{display_name}, não entendi sua pergunta. 
 
 Tente:
 • "meus tickets" 
@@ -417,55 +669,197 @@ Tente:
 • "deadlines próximos"
 • "help" para ver todos os comandos"""
 
+# Palavra-chave -> handler (a ordem define a prioridade)
+KEYWORDS = {
+    "meus tickets": handle_tickets,
+    "tickets": handle_tickets,
+    "minhas tarefas": handle_tickets,
+    "relatório": handle_team,
+    "equipe": handle_team,
+    "time": handle_team,
+    "team": handle_team,
+    "deadline": handle_deadlines,
+    "prazo": handle_deadlines,
+    "vencimento": handle_deadlines,
+    "entrega": handle_deadlines,
+    "help": handle_help,
+    "ajuda": handle_help,
+    "comandos": handle_help,
+}
+
+def process_natural_question(text, user_id, channel_id):
+    """Processa pergunta em linguagem natural"""
+    
+    # Remover menção ao bot (antes do lower, o ID da menção é maiúsculo)
+    text_clean = _MENTION_RE.sub('', text).lower().strip()
+    
+    # Buscar informações do usuário
+    slack_user = get_slack_user_by_mention(user_id)
+    if not slack_user:
+        return "❌ Não consegui identificar seu usuário."
+    
+    user_email = slack_user.get("profile", {}).get("email", "")
+    if not user_email:
+        # Tentar construir email pelo nome de usuário
+        username = slack_user.get("name", "")
+        user_email = username + EMAIL_DOMAIN
+    
+    display_name = slack_user.get("real_name", slack_user.get("name", ""))
+    
+    handler = next((KEYWORDS[k] for k in KEYWORDS if k in text_clean), handle_default)
+    return handler(user_email, display_name)
+
 # ========================================
 # 🕐 MONITORAMENTO AUTOMÁTICO (DMs)
 # ========================================
 
+# Coalescência: no máximo uma verificação rodando + uma pendente
+_check_lock = Lock()
+_check_running = False
+_check_pending = False
+
 def check_new_assignments():
-    """Verifica novas atribuições para DMs automáticas"""
-    try:
-        current_hour = datetime.now().hour
-        if current_hour < NOTIFICATION_HOURS[0] or current_hour > NOTIFICATION_HOURS[1]:
+    """Verifica novas atribuições (chamadas sobrepostas viram uma só)"""
+    global _check_running, _check_pending
+    
+    with _check_lock:
+        if _check_running:
+            _check_pending = True
             return
+        _check_running = True
+    
+    while True:
+        _run_assignment_check()
         
-        print("🔍 Verificando novas atribuições...")
+        with _check_lock:
+            if not _check_pending:
+                _check_running = False
+                return
+            _check_pending = False
+
+# Verificações seguidas sem atribuições (aumenta o intervalo do polling)
+_empty_streak = 0
+
+def _run_assignment_check():
+    """Verifica novas atribuições para DMs automáticas"""
+    global _empty_streak
+    try:
+        logger.info("🔍 Verificando novas atribuições...")
         assignments = get_recent_assignments()
         
+        # Agrupar por pessoa: uma DM por assignee, não por ticket
+        by_user = defaultdict(list)
         for assignment in assignments:
-            if assignment["fields"].get("assignee"):
-                send_slack_notification(assignment)
+            assignee = assignment["fields"].get("assignee")
+            if assignee and is_new_assignment(assignment):
+                by_user[assignee["emailAddress"]].append(assignment)
+        
+        # Só atribuições novas contam: repetidas (já notificadas) não resetam o backoff
+        _empty_streak = 0 if by_user else _empty_streak + 1
+        
+        list(notif_pool.map(send_slack_notification, by_user.keys(), by_user.values()))
         
         if assignments:
-            print(f"📋 Processadas {len(assignments)} atribuições")
+            logger.info(f"📋 Processadas {len(assignments)} atribuições")
         
     except Exception as e:
-        print(f"❌ Erro no monitoramento: {e}")
+        logger.error(f"❌ Erro no monitoramento: {e}")
+
+def get_check_interval_minutes():
+    """Intervalo atual: dobra a cada verificação vazia, até o teto"""
+    ceiling = max(MAX_CHECK_INTERVAL_MINUTES, CHECK_INTERVAL_MINUTES)
+    return min(CHECK_INTERVAL_MINUTES * 2 ** min(_empty_streak, 10), ceiling)
+
+def is_notification_hour(moment):
+    """True se o horário está dentro de NOTIFICATION_HOURS"""
+    return NOTIFICATION_HOURS[0] <= moment.hour <= NOTIFICATION_HOURS[1]
+
+def get_next_check_delay(now=None):
+    """Segundos até a próxima verificação (pula fora do horário comercial)"""
+    now = now or datetime.now()
+    candidate = now + timedelta(minutes=get_check_interval_minutes())
+    
+    if is_notification_hour(candidate):
+        return (candidate - now).total_seconds()
+    
+    # Fora do horário: dormir até o início do próximo expediente
+    next_start = candidate.replace(hour=NOTIFICATION_HOURS[0], minute=0, second=0, microsecond=0)
+    if next_start <= candidate:
+        next_start += timedelta(days=1)
+    return (next_start - now).total_seconds()
+
+def schedule_next_check():
+    """Agenda a próxima verificação com um Timer"""
+    timer = Timer(get_next_check_delay(), run_scheduled_check)
+    timer.daemon = True
+    timer.start()
+
+def run_scheduled_check():
+    """Executa a verificação e reagenda a próxima"""
+    try:
+        check_new_assignments()
+    finally:
+        schedule_next_check()
 
 def start_monitoring():
     """Inicia monitoramento automático"""
-    schedule.every(CHECK_INTERVAL_MINUTES).minutes.do(check_new_assignments)
-    
-    print(f"🚀 Monitoramento DM iniciado (a cada {CHECK_INTERVAL_MINUTES}min)")
+    schedule_next_check()
     
-    while True:
-        schedule.run_pending()
-        time.sleep(30)
+    logger.info(f"🚀 Monitoramento DM iniciado (a cada {CHECK_INTERVAL_MINUTES}min, {NOTIFICATION_HOURS[0]}h-{NOTIFICATION_HOURS[1]}h)")
 
 # ========================================
 # 🎯 EVENTOS SLACK (CANAL PÚBLICO)
 # ========================================
 
+# Nome do bot no texto, sem alocar text.lower() a cada evento
+_JIRALDO_RE = re.compile(r'jiraldo', re.IGNORECASE)
+
+# event_id dos eventos Slack já processados (Slack reenvia em caso de timeout)
+_seen_events = OrderedDict()
+_seen_events_lock = Lock()
+
+def verify_slack_signature():
+    """Confere X-Slack-Signature (HMAC-SHA256 do corpo bruto) antes de qualquer parse"""
+    # Sem secret não há como validar: recusa (igual ao webhook Jira)
+    if not SLACK_SIGNING_SECRET:
+        return False
+    
+    timestamp = request.headers.get("X-Slack-Request-Timestamp", "")
+    signature = request.headers.get("X-Slack-Signature", "")
+    if not timestamp.isdigit() or abs(time.time() - int(timestamp)) > SLACK_SIGNATURE_MAX_AGE:
+        return False
+    
+    base_string = b"v0:" + timestamp.encode() + b":" + request.get_data()
+    expected = "v0=" + hmac.new(SLACK_SIGNING_SECRET.encode(), base_string, hashlib.sha256).hexdigest()
+    # Bytes: compare_digest com str não-ASCII levanta TypeError (500 em vez de 401)
+    return hmac.compare_digest(expected.encode(), signature.encode("latin-1"))
+
 @app.route("/events", methods=["POST"])
 def slack_events():
     """Processa eventos do Slack"""
     
-    data = request.json
+    if not verify_slack_signature():
+        return "invalid signature", 401
+    
+    try:
+        data = orjson.loads(request.get_data())
+    except orjson.JSONDecodeError:
+        return "invalid json", 400
+    
+    if not isinstance(data, dict):
+        return "invalid json", 400
     
     # Verificação inicial do Slack
     if "challenge" in data:
-        print("🔍 Challenge recebido do Slack")
+        logger.info("🔍 Challenge recebido do Slack")
         return data["challenge"]
     
+    # Ignorar reenvios de eventos já processados
+    event_id = data.get("event_id")
+    if event_id and not mark_seen(_seen_events, _seen_events_lock, event_id, SEEN_EVENTS_CACHE_SIZE):
+        logger.info(f"🔁 Evento repetido ignorado: {event_id} (retry {request.headers.get('X-Slack-Retry-Num', '-')})")
+        return "ok"
+    
     # Verificar se é um evento válido
     event = data.get("event", {})
     event_type = event.get("type")
@@ -481,54 +875,130 @@ def slack_events():
         thread_ts = event.get("thread_ts", event.get("ts"))
         
         # Verificar se o bot foi mencionado
-        if "jiraldo" in text.lower() or f"<@{get_bot_user_id()}>" in text:
+        if _JIRALDO_RE.search(text) or (get_bot_user_id() and _bot_mention in text):
             
             # Log da interação
-            print(f"🗨️ Mensagem recebida: Canal {channel_id}, User {user_id}: {text}")
-            
-            # Processar pergunta
-            response = process_natural_question(text, user_id, channel_id)
+            logger.info(f"🗨️ Mensagem recebida: Canal {channel_id}, User {user_id}: {text}")
             
-            # Enviar resposta
-            success = send_channel_message(channel_id, response, thread_ts)
-            
-            if success:
-                print(f"✅ Resposta enviada para canal {channel_id}")
-            else:
-                print(f"❌ Erro ao enviar resposta para canal {channel_id}")
+            # Responder em background: Slack reenvia o evento se não houver ACK em 3s
+            executor.submit(_handle_message, channel_id, user_id, text, thread_ts)
     
     return "ok"
 
+def _handle_message(channel_id, user_id, text, thread_ts):
+    """Processa a pergunta e responde no canal (roda no executor)"""
+    try:
+        # Processar pergunta
+        response = process_natural_question(text, user_id, channel_id)
+        
+        # Enviar resposta
+        success = send_channel_message(channel_id, response, thread_ts)
+        
+        if success:
+            logger.info(f"✅ Resposta enviada para canal {channel_id}")
+        else:
+            logger.error(f"❌ Erro ao enviar resposta para canal {channel_id}")
+    
+    except Exception as e:
+        logger.error(f"❌ Erro ao processar mensagem: {e}")
+
+# ID do bot não muda durante o processo: buscado uma vez só
+_bot_user_id = None
+_bot_mention = None
+
 def get_bot_user_id():
-    """Obtém ID do bot"""
+    """Obtém ID do bot (memoizado)"""
+    global _bot_user_id, _bot_mention
+    if _bot_user_id:
+        return _bot_user_id
+    
     try:
-        headers = {"Authorization": f"Bearer {SLACK_BOT_TOKEN}"}
-        response = requests.get("https://slack.com/api/auth.test", headers=headers)
-        if response.json().get("ok"):
-            return response.json()["user_id"]
+        response = slack_request("GET", "https://slack.com/api/auth.test", timeout=HTTP_TIMEOUT)
+        data = orjson.loads(response.content)
+        if data.get("ok"):
+            _bot_user_id = data["user_id"]
+            _bot_mention = f"<@{_bot_user_id}>"
     except:
         pass
-    return None
+    return _bot_user_id
+
+# ========================================
+# 🪝 WEBHOOK JIRA (ATRIBUIÇÕES EM TEMPO REAL)
+# ========================================
+
+def verify_jira_webhook():
+    """Valida o webhook: HMAC do Jira (X-Hub-Signature) ou token compartilhado"""
+    if not JIRA_WEBHOOK_SECRET:
+        return False
+    
+    signature = request.headers.get("X-Hub-Signature", "")
+    if signature:
+        expected = "sha256=" + hmac.new(JIRA_WEBHOOK_SECRET.encode(), request.get_data(), hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected.encode(), signature.encode("latin-1"))
+    
+    token = request.headers.get("X-Jiraldo-Token", "")
+    return hmac.compare_digest(token.encode("latin-1"), JIRA_WEBHOOK_SECRET.encode())
+
+@app.route("/jira-webhook", methods=["POST"])
+@app.route("/webhooks/jira", methods=["POST"])
+def jira_webhook():
+    """Recebe jira:issue_updated e notifica mudanças de assignee"""
+    
+    if not verify_jira_webhook():
+        return "unauthorized", 401
+    
+    data = request.get_json(silent=True)
+    
+    if not isinstance(data, dict) or data.get("webhookEvent") != "jira:issue_updated":
+        return "ok"
+    
+    # Só interessa se o assignee mudou
+    changelog = data.get("changelog", {}).get("items", [])
+    if not any(item.get("field") == "assignee" for item in changelog):
+        return "ok"
+    
+    issue = data.get("issue", {})
+    if not issue.get("fields", {}).get("assignee"):
+        # Ticket ficou sem assignee: uma nova atribuição deve ser notificada
+        if issue.get("key"):
+            forget_assignment(issue["key"])
+        return "ok"
+    
+    # Fora do horário comercial a DM fica para a primeira verificação do dia
+    # (a janela do polling cobre todo o período desde a última busca)
+    if not is_notification_hour(datetime.now()):
+        logger.info(f"🌙 Webhook Jira: {issue.get('key')} atribuído fora do horário, notificação adiada")
+        return "ok"
+    
+    logger.info(f"🪝 Webhook Jira: {issue.get('key')} atribuído")
+    notif_pool.submit(notify_assignment_once, issue)
+    
+    return "ok"
 
 # ========================================
 # 🔍 ENDPOINTS DEBUG + COMPATIBILIDADE
 # ========================================
 
+# Partes constantes dos endpoints de debug/health (montadas uma vez)
+_DEBUG_STATIC = {
+    "bot_status": "🤖 Canal Público + DMs Automáticas",
+    "features": ["event_subscriptions", "natural_language", "team_reports", "auto_notifications"],
+    "environment_check": {
+        "SLACK_BOT_TOKEN": "✅ Configurado" if SLACK_BOT_TOKEN else "❌ Faltando",
+        "SLACK_SIGNING_SECRET": "✅ Configurado" if SLACK_SIGNING_SECRET else "❌ Faltando (requisições Slack recusadas)",
+        "JIRA_EMAIL": JIRA_EMAIL if JIRA_EMAIL else "❌ Faltando", 
+        "JIRA_API_TOKEN": "✅ Configurado" if JIRA_API_TOKEN else "❌ Faltando",
+        "JIRA_WEBHOOK_SECRET": "✅ Configurado" if JIRA_WEBHOOK_SECRET else "⚠️ Só polling",
+        "JIRA_BASE_URL": JIRA_BASE_URL,
+        "EMAIL_DOMAIN": EMAIL_DOMAIN
+    }
+}
+_HEALTH_STATIC = {"status": "ok", "mode": "canal_publico", "endpoint_events": "/events"}
+
 @app.route("/debug", methods=["GET"])
 def debug_info():
     """Debug endpoint"""
-    return jsonify({
-        "timestamp": datetime.now().isoformat(),
-        "bot_status": "🤖 Canal Público + DMs Automáticas",
-        "features": ["event_subscriptions", "natural_language", "team_reports", "auto_notifications"],
-        "environment_check": {
-            "SLACK_BOT_TOKEN": "✅ Configurado" if SLACK_BOT_TOKEN else "❌ Faltando",
-            "JIRA_EMAIL": JIRA_EMAIL if JIRA_EMAIL else "❌ Faltando", 
-            "JIRA_API_TOKEN": "✅ Configurado" if JIRA_API_TOKEN else "❌ Faltando",
-            "JIRA_BASE_URL": JIRA_BASE_URL,
-            "EMAIL_DOMAIN": EMAIL_DOMAIN
-        }
-    })
+    return jsonify({**_DEBUG_STATIC, "timestamp": datetime.now().isoformat()})
 
 @app.route("/test-user/<username>", methods=["GET"])
 def test_user_tickets(username):
@@ -544,51 +1014,95 @@ def test_user_tickets(username):
         "note": "Use @Jiraldo meus tickets no canal público!"
     })
 
-# Compatibilidade com slash commands
+def _do_command(text, user_id, channel_id, response_url):
+    """Executa o slash command em background e responde via response_url"""
+    try:
+        result = process_natural_question(text, user_id, channel_id)
+        # response_url não precisa de auth: nunca usar slack_session (leva o bot token)
+        requests.post(
+            response_url,
+            json={"response_type": "ephemeral", "text": result},
+            timeout=HTTP_TIMEOUT
+        )
+    except Exception as e:
+        logger.error(f"❌ Erro no slash command: {e}")
+
+# Único destino aceito para respostas de slash command
+SLACK_RESPONSE_URL_PREFIX = "https://hooks.slack.com/"
+
+# Slash commands (ACK imediato, resposta via response_url)
 @app.route("/jiraldo", methods=["POST"])
 def jiraldo_command():
-    """Compatibilidade com comandos slash"""
-    return jsonify({
-        "response_type": "ephemeral",
-        "text": "🎉 Jiraldo agora funciona em canal público! \nVá para #jiraldo e digite: @Jiraldo meus tickets"
-    })
+    """Slash command /jiraldo"""
+    if not verify_slack_signature():
+        return "invalid signature", 401
+    
+    response_url = request.form.get("response_url")
+    if not response_url:
+        return jsonify({
+            "response_type": "ephemeral",
+            "text": "🎉 Jiraldo agora funciona em canal público! \nVá para #jiraldo e digite: @Jiraldo meus tickets"
+        })
+    
+    if not response_url.startswith(SLACK_RESPONSE_URL_PREFIX):
+        return "invalid response_url", 400
+    
+    executor.submit(
+        _do_command,
+        request.form.get("text", ""),
+        request.form.get("user_id"),
+        request.form.get("channel_id"),
+        response_url
+    )
+    
+    # Slack exige resposta em até 3s
+    return jsonify({"response_type": "ephemeral", "text": "⏳ Buscando..."})
 
 @app.route("/health", methods=["GET"])
 def health():
     """Health check"""
-    return {"status": "ok", "mode": "canal_publico", "endpoint_events": "/events", "timestamp": datetime.now().isoformat()}
+    return jsonify({**_HEALTH_STATIC, "timestamp": datetime.now().isoformat()})
+
+_HOME_INFO = {
+    "message": "🤖 Jiraldo Canal Público Online!", 
+    "version": "2.0",
+    "features": "Canal público + DMs automáticas",
+    "endpoints": {
+        "events": "/events",
+        "jira_webhook": "/jira-webhook",
+        "debug": "/debug", 
+        "health": "/health"
+    }
+}
 
 @app.route("/", methods=["GET"])
 def home():
     """Home"""
-    return {
-        "message": "🤖 Jiraldo Canal Público Online!", 
-        "version": "2.0",
-        "features": "Canal público + DMs automáticas",
-        "endpoints": {
-            "events": "/events",
-            "debug": "/debug", 
-            "health": "/health"
-        }
-    }
+    return jsonify(_HOME_INFO)
 
 # ========================================
 # 🚀 INICIALIZAÇÃO
 # ========================================
 
-if __name__ == "__main__":
-    print("🤖 Jiraldo CANAL PÚBLICO + DMs iniciando...")
-    print("💬 Modo: Event Subscriptions + Linguagem Natural")
-    print("🔔 DMs automáticas: ATIVO")
-    print("🔗 Endpoint eventos: /events")
-    print(f"🚪 Porta: {PORT}")
+def init_bot():
+    """Inicialização do bot (chamada pelo gunicorn.conf.py ou localmente)"""
+    logger.info("🤖 Jiraldo CANAL PÚBLICO + DMs iniciando...")
+    logger.info("💬 Modo: Event Subscriptions + Linguagem Natural")
+    logger.info("🔔 DMs automáticas: ATIVO")
+    logger.info("🔗 Endpoint eventos: /events")
+    logger.info(f"🚪 Porta: {PORT}")
     
     # Teste conexão se tokens configurados
     if all([SLACK_BOT_TOKEN, JIRA_EMAIL, JIRA_API_TOKEN]):
-        # Iniciar monitoramento DM em thread separada
-        monitor_thread = Thread(target=start_monitoring, daemon=True)
-        monitor_thread.start()
-        print("✅ Monitoramento DM ativo!")
-    
-    print("🌐 Servidor iniciando...")
+        # Resolver o ID do bot antes do primeiro evento
+        logger.info(f"🤖 Bot user ID: {get_bot_user_id()}")
+        
+        # Iniciar monitoramento DM (Timer em background)
+        start_monitoring()
+        logger.info("✅ Monitoramento DM ativo!")
+
+if __name__ == "__main__":
+    # Apenas desenvolvimento local; em produção: gunicorn -c gunicorn.conf.py main:app
+    init_bot()
+    logger.info("🌐 Servidor de desenvolvimento iniciando...")
     app.run(host="0.0.0.0", port=PORT, debug=False)